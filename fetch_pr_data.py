@@ -2,21 +2,25 @@ import sys
 import json
 import os
 import re
+import asyncio
 import dataclasses
+import sqlite3
 import time
-import concurrent.futures
-from datetime import datetime, timedelta, timezone
-from typing import Generator, Dict, List, Any, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import ClassVar, Generator, Dict, List, Any, Tuple
 from zoneinfo import ZoneInfo
 
+import aiohttp
 import config as cfg
-import numpy as np
-import requests
+import orjson
 # from holiday_jp import HolidayJp
 from tqdm import tqdm
 
+JST = ZoneInfo("Asia/Tokyo")
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(slots=True)
 class PullRequest:
     title: str
     created: datetime
@@ -25,6 +29,15 @@ class PullRequest:
     is_merged: bool
     num_comments: int
 
+    # 基準時刻（PRごとに datetime.now を呼ばないように1回だけ計算する）
+    now_jst: ClassVar[datetime | None] = None
+
+    @classmethod
+    def now(cls) -> datetime:
+        if cls.now_jst is None:
+            cls.now_jst = datetime.now(JST)
+        return cls.now_jst
+
     @staticmethod
     def daterange(start: datetime, end: datetime) -> Generator[datetime, None, None]:
         current = start
@@ -36,7 +49,7 @@ class PullRequest:
         return self.closed is not None
 
     def elapsed(self) -> timedelta:
-        end = self.closed or datetime.now().astimezone(ZoneInfo("Asia/Tokyo"))
+        end = self.closed or self.now()
         return end - self.created
 
     def calc_non_business_days(self, end_dt: datetime) -> int:
@@ -58,7 +71,7 @@ class PullRequest:
 
     def elapsed_business_days(self) -> timedelta:
         if self.closed is None:
-            end_dt = datetime.now().astimezone(ZoneInfo("Asia/Tokyo"))
+            end_dt = self.now()
         else:
             end_dt = self.closed
 
@@ -69,7 +82,7 @@ class PullRequest:
 
     def first_review_elapsed_business_days(self) -> timedelta:
         if self.first_review is None:
-            end_dt = datetime.now().astimezone(ZoneInfo("Asia/Tokyo"))
+            end_dt = self.now()
         else:
             end_dt = self.first_review
 
@@ -79,13 +92,6 @@ class PullRequest:
         return end_dt - self.created
 
 
-def validate_date(date_string: str) -> None:
-    pattern = r"^\d{4}-\d{2}-\d{2}$"
-    if not re.match(pattern, date_string):
-        print("date format must be yyyy-mm-dd")
-        sys.exit(1)
-
-
 def validate_period(from_date: str, to_date: str) -> None:
     if from_date > to_date:
         print("from_date must be earlier than to_date")
@@ -95,100 +101,136 @@ def validate_period(from_date: str, to_date: str) -> None:
 def convert_to_jst(time_str: str | None) -> datetime | None:
     if time_str is None:
         return None
-    time_dt = datetime.strptime(time_str.replace("Z", ""), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
-    return time_dt.astimezone(ZoneInfo("Asia/Tokyo"))
+    # fromisoformat はC実装でstrptimeより大幅に速い
+    time_dt = datetime.fromisoformat(time_str.replace("Z", "+00:00"))
+    return time_dt.astimezone(JST)
 
 
-def fetch_page(url: str, headers: Dict[str, str], page: int) -> Dict[str, Any]:
-    """1ページ分のデータを取得する関数（並列処理用）"""
-    paginated_url = f"{url}&page={page}"
-    response = requests.get(paginated_url, headers=headers)
-    
-    if response.status_code != 200:
-        print(f"Error fetching page {page}: {response.status_code}")
-        print(f"message: {response.json()['message']}")
-        print(f"documentation_url: {response.json()['documentation_url']}")
-        return {"items": [], "error": True, "status_code": response.status_code}
-    
-    return response.json()
-
-
-def search_pr_by_authors(usernames: list[str], from_date: str, to_date: str, token: str) -> dict:
-    headers = {
+def make_headers(token: str) -> Dict[str, str]:
+    """GitHub API共通のリクエストヘッダを組み立てる（セッション生成時に1回だけ呼ぶ）"""
+    return {
         "Accept": "application/vnd.github.text-match+json",
         "Authorization": f"Bearer {token}",
         "X-GitHub-Api-Version": "2022-11-28",
     }
-    usernames = usernames.copy()
-    usernames.insert(0, "")  # Insert empty string to add prefix for the first element
 
-    query_webapp = "type:pr org:SafieDev"
-    query_webapp += " author:".join(usernames)
-    query_webapp += f" created:{from_date}..{to_date}"
-    print("Search query for webapp: ")
-    print(query_webapp)
 
-    query_rest = "type:pr+org:SafieDev"
-    query_rest += "+author:".join(usernames)
-    query_rest += f"+created:{from_date}..{to_date}&sort=created&order=desc&per_page=100"
-    
-    base_url = f"https://api.github.com/search/issues?q={query_rest}"
-    
-    # 最初のページを取得して総数を確認
-    print("Fetching first page to determine total count...")
-    first_page = fetch_page(base_url, headers, 1)
-    
-    if "error" in first_page and first_page["error"]:
-        print(f"Error fetching first page: {first_page.get('status_code')}")
-        sys.exit(1)
-    
+def make_async_session(token: str) -> "aiohttp.ClientSession":
+    """非同期リクエスト用のClientSessionを作成する
+
+    コネクション数の上限とDNSキャッシュを設定して、fan-out時の
+    接続確立コストを抑える
+    """
+    connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+    return aiohttp.ClientSession(headers=make_headers(token), connector=connector)
+
+
+SEARCH_MAX_PAGES = 10  # Search APIは1クエリあたり最大1000件（100件×10ページ）
+SEARCH_CONCURRENCY = 2  # Search APIは別枠のレート制限（30回/分）なので控えめに
+
+
+async def fetch_search_page(
+    session: "aiohttp.ClientSession", semaphore: "asyncio.Semaphore", base_url: str, page: int
+) -> Dict[str, Any]:
+    """検索結果の1ページ分を取得する関数（非同期処理用）"""
+    async with semaphore:
+        status, _, body = await request_with_rate_limit(session, "GET", f"{base_url}&page={page}")
+        if status != 200:
+            print(f"Error fetching search page {page}: {status}")
+            return {"items": [], "error": True, "status_code": status}
+        return body
+
+
+async def search_pr_for_author(
+    session: "aiohttp.ClientSession",
+    semaphore: "asyncio.Semaphore",
+    author: str,
+    from_date: str,
+    to_date: str,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """1著者分の検索クエリを実行し (total_count, items) を返す"""
+    query = f"type:pr+org:SafieDev+author:{author}"
+    query += f"+created:{from_date}..{to_date}&sort=created&order=desc&per_page=100"
+    base_url = f"https://api.github.com/search/issues?q={query}"
+
+    # 1ページ目を待ってから残りを取りに行くと1RTT余計にかかるため、
+    # 上限ページまで投機的にタスク化しておき、総件数が判明した時点で
+    # 不要ページをキャンセルする（セマフォ待ちのタスクはリクエストを送らない）
+    tasks = [
+        asyncio.ensure_future(fetch_search_page(session, semaphore, base_url, page))
+        for page in range(1, SEARCH_MAX_PAGES + 1)
+    ]
+    try:
+        first_page = await tasks[0]
+    except Exception as exc:
+        first_page = {"items": [], "error": True, "status_code": exc}
+    if first_page.get("error"):
+        for task in tasks[1:]:
+            task.cancel()
+        await asyncio.gather(*tasks[1:], return_exceptions=True)
+        print(f"Error searching PRs for {author}: {first_page.get('status_code')}")
+        return 0, []
+
     total_count = first_page["total_count"]
-    print(f"Total PRs to fetch: {total_count}")
-    
-    # 必要なページ数を計算
-    pages_needed = (total_count + 99) // 100  # 切り上げ除算
-    print(f"Pages needed: {pages_needed}")
-    
-    # 最初のページは既に取得済み
-    all_items = first_page["items"]
-    
-    # 2ページ目以降を並列で取得
-    if pages_needed > 1:
-        if pages_needed > 10:
-            pages_needed = 10  # 最大10ページまで並列で取得
-        print(f"Fetching remaining {pages_needed - 1} pages in parallel...")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(10, pages_needed - 1)) as executor:
-            # 2ページ目から並列で取得
-            future_to_page = {
-                executor.submit(fetch_page, base_url, headers, page): page
-                for page in range(2, pages_needed + 1)
-            }
-            
-            for future in tqdm(concurrent.futures.as_completed(future_to_page), total=len(future_to_page)):
-                page = future_to_page[future]
-                try:
-                    data = future.result()
-                    if "error" in data and data["error"]:
-                        print(f"Error fetching page {page}: {data.get('status_code')}")
-                        continue
-                    all_items.extend(data["items"])
-                except Exception as exc:
-                    print(f"Page {page} generated an exception: {exc}")
-    
-    # 結果を構築
-    result = first_page.copy()
-    result["items"] = all_items
-    
+    items = first_page["items"]
+
+    pages_needed = min((total_count + 99) // 100, SEARCH_MAX_PAGES)  # 切り上げ除算
+    for task in tasks[pages_needed:]:
+        task.cancel()
+    await asyncio.gather(*tasks[pages_needed:], return_exceptions=True)
+
+    # 1ページの失敗で全体を落とさない（不足分は末尾のWarningで件数に表れる）
+    pages = await asyncio.gather(*tasks[1:pages_needed], return_exceptions=True)
+    for page_data in pages:
+        if isinstance(page_data, BaseException):
+            print(f"Error searching PRs for {author}: {page_data}")
+            continue
+        if not page_data.get("error"):
+            items.extend(page_data["items"])
+
+    return total_count, items
+
+
+async def search_prs_async(usernames: list[str], from_date: str, to_date: str, token: str) -> dict:
+    """著者ごとの検索クエリを並行実行して結果をマージする
+
+    OR連結の単一クエリだと1000件のSearch API上限に当たるため、
+    著者単位にクエリを分割して上限を著者ごとに引き上げる
+    """
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    async with make_async_session(token) as session:
+        results = await asyncio.gather(
+            *[
+                search_pr_for_author(session, semaphore, author, from_date, to_date)
+                for author in usernames
+            ]
+        )
+
+    # html_urlで重複を除去しつつマージ
+    total_count = 0
+    merged: Dict[str, Dict[str, Any]] = {}
+    for author_total, items in results:
+        total_count += author_total
+        for item in items:
+            merged[item["html_url"]] = item
+
+    all_items = list(merged.values())
     print(f"Total PRs fetched: {len(all_items)} / {total_count}")
-    
     if len(all_items) < total_count:
         print(f"Warning: Could only fetch {len(all_items)} PRs out of {total_count} total PRs.")
-    
-    if False:  # for debug
-        search_cache = f"search_result_{from_date}_{to_date}.json"
-        json.dump(result, open(search_cache, "w"), indent=2)
 
-    return result
+    return {"total_count": total_count, "incomplete_results": False, "items": all_items}
+
+
+def search_pr_by_authors(usernames: list[str], from_date: str, to_date: str, token: str) -> dict:
+    query_webapp = "type:pr org:SafieDev"
+    query_webapp += "".join(f" author:{author}" for author in usernames)
+    query_webapp += f" created:{from_date}..{to_date}"
+    print("Search query for webapp: ")
+    print(query_webapp)
+
+    print(f"Searching PRs with {len(usernames)} per-author queries...")
+    return asyncio.run(search_prs_async(usernames, from_date, to_date, token))
 
 
 def check_pr_update(item: dict, search_api_cache: dict) -> bool:
@@ -200,81 +242,347 @@ def check_pr_update(item: dict, search_api_cache: dict) -> bool:
     return True
 
 
-def fetch_api_data(url: str, token: str) -> Dict[str, Any]:
-    """APIからデータを取得する関数（並列処理用）"""
-    headers = {
-        "Accept": "application/vnd.github.text-match+json",
-        "Authorization": f"Bearer {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
+CACHE_DB_FILENAME = "cache.db"
+CACHE_TTL_DAYS = 180  # これより古いエントリは起動時に削除
+CACHE_MAX_ENTRIES = 20000  # 超過分はLRUで削除
+
+
+class PullsApiCache:
+    """api_cacheテーブルをdictのように扱うラッパー
+
+    JSONファイル全体の読み書きと違い、O(1)のルックアップと逐次書き込みが
+    でき、途中で落ちてもコミット済みのデータは失われない
+    """
+
+    COMMIT_INTERVAL = 100  # この回数書き込むごとにコミット
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._pending = 0
+
+    def __contains__(self, url: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM api_cache WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, url: str) -> Dict[str, Any]:
+        row = self.conn.execute("SELECT etag, body FROM api_cache WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        # LRU削除用にアクセス時刻を記録
+        self.conn.execute(
+            "UPDATE api_cache SET last_access = ? WHERE url = ?", (int(time.time()), url)
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_INTERVAL:
+            self.commit()
+        return {"etag": row[0], "body": orjson.loads(row[1])}
+
+    def __setitem__(self, url: str, entry: Dict[str, Any]) -> None:
+        now = int(time.time())
+        self.conn.execute(
+            "INSERT OR REPLACE INTO api_cache (url, etag, body, fetched_at, last_access)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (url, entry.get("etag"), orjson.dumps(entry["body"]), now, now),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_INTERVAL:
+            self.commit()
+
+    def get(self, url: str, default: Any = None) -> Any:
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+
+class SearchApiCache:
+    """search_updatesテーブルをdictのように扱うラッパー（値はupdated_at文字列）"""
+
+    COMMIT_INTERVAL = 100
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._pending = 0
+
+    def __contains__(self, url: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM search_updates WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, url: str) -> str:
+        row = self.conn.execute("SELECT updated_at FROM search_updates WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return row[0]
+
+    def __setitem__(self, url: str, updated_at: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO search_updates (url, updated_at) VALUES (?, ?)",
+            (url, updated_at),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+
+def import_legacy_json_caches(conn: sqlite3.Connection) -> None:
+    """旧JSONキャッシュファイルが残っていれば一度だけSQLiteに取り込む"""
+    pulls_filename = "pulls_api_cache.json"
+    if os.path.exists(pulls_filename):
+        print(f"Importing legacy cache {pulls_filename} into {CACHE_DB_FILENAME}...")
+        with open(pulls_filename, "rb") as f:
+            legacy = orjson.loads(f.read())
+        now = int(time.time())
+        for url, entry in legacy.items():
+            # 旧形式（レスポンスボディを直接格納）も受け付ける
+            if not (isinstance(entry, dict) and "etag" in entry and "body" in entry):
+                entry = {"etag": None, "body": entry}
+            conn.execute(
+                "INSERT OR REPLACE INTO api_cache (url, etag, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, entry.get("etag"), orjson.dumps(entry["body"]), now),
+            )
+
+    search_filename = "search_api_cache.json"
+    if os.path.exists(search_filename):
+        print(f"Importing legacy cache {search_filename} into {CACHE_DB_FILENAME}...")
+        with open(search_filename, "rb") as f:
+            legacy = orjson.loads(f.read())
+        for url, updated_at in legacy.items():
+            conn.execute(
+                "INSERT OR REPLACE INTO search_updates (url, updated_at) VALUES (?, ?)",
+                (url, updated_at),
+            )
+
+    conn.commit()
+
+
+def prune_api_cache(conn: sqlite3.Connection) -> None:
+    """古い・使われていないキャッシュエントリを削除して肥大化を防ぐ
+
+    TTL超過分（CACHE_TTL_DAYS）を削除し、それでも上限を超える場合は
+    最終アクセスの古い順（LRU）に削除する
+    """
+    cutoff = int(time.time()) - CACHE_TTL_DAYS * 24 * 3600
+    deleted = conn.execute("DELETE FROM api_cache WHERE fetched_at < ?", (cutoff,)).rowcount
+
+    # search_updatesも同じTTLで間引く（ISO形式なので文字列比較で可）
+    search_cutoff = (datetime.now(JST) - timedelta(days=CACHE_TTL_DAYS)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    deleted += conn.execute("DELETE FROM search_updates WHERE updated_at < ?", (search_cutoff,)).rowcount
+
+    count = conn.execute("SELECT COUNT(*) FROM api_cache").fetchone()[0]
+    if count > CACHE_MAX_ENTRIES:
+        overflow = count - CACHE_MAX_ENTRIES
+        conn.execute(
+            "DELETE FROM api_cache WHERE url IN ("
+            " SELECT url FROM api_cache"
+            " ORDER BY COALESCE(last_access, fetched_at) LIMIT ?)",
+            (overflow,),
+        )
+        deleted += overflow
+
+    if deleted > 0:
+        print(f"Pruned {deleted} stale cache entries")
+    conn.commit()
+
+
+def open_cache_db(db_path: str) -> sqlite3.Connection:
+    """キャッシュDBを開く（初回は旧JSONキャッシュを取り込む）"""
+    first_open = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS api_cache"
+        " (url TEXT PRIMARY KEY, etag TEXT, body BLOB, fetched_at INTEGER, last_access INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS search_updates (url TEXT PRIMARY KEY, updated_at TEXT)"
+    )
+    conn.commit()
+    if first_open:
+        import_legacy_json_caches(conn)
+    else:
+        # 既存DBにlast_access列がなければ追加
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(api_cache)")]
+        if "last_access" not in columns:
+            conn.execute("ALTER TABLE api_cache ADD COLUMN last_access INTEGER")
+            conn.commit()
+    prune_api_cache(conn)
+    return conn
+
+
+async def request_with_rate_limit(
+    session: "aiohttp.ClientSession",
+    method: str,
+    url: str,
+    max_retries: int = 3,
+    **kwargs: Any,
+) -> Tuple[int, Dict[str, str], Any]:
+    """レート制限を考慮してリクエストを送る（非同期処理用）
+
+    403/429は Retry-After（なければ X-RateLimit-Reset）まで待って再試行し、
+    X-RateLimit-Remaining が少なくなってきたらリセット時刻までのペースに
+    合わせて送信間隔を空ける。従来の sys.exit(1) と違い途中結果を失わない
+    """
+    for attempt in range(max_retries + 1):
+        async with session.request(method, url, **kwargs) as response:
+            if response.status in (403, 429) and attempt < max_retries:
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None:
+                    wait = int(retry_after)
+                else:
+                    reset = response.headers.get("X-RateLimit-Reset")
+                    wait = max(0, int(reset) - int(time.time())) if reset else 2 ** attempt
+                print(f"Rate limited ({response.status}) on {url}: retrying in {wait + 1}s...")
+                await asyncio.sleep(wait + 1)
+                continue
+
+            body = await response.json(content_type=None) if response.status == 200 else None
+            headers = dict(response.headers)
+
+            # 残りリクエスト数が少ないときはリセットまでのペースに合わせる
+            # （エラー応答はこのURLにとって終端なので待たずに返す）
+            if response.status in (200, 304):
+                remaining = headers.get("X-RateLimit-Remaining")
+                reset = headers.get("X-RateLimit-Reset")
+                if remaining is not None and reset is not None and int(remaining) < 50:
+                    pace = (int(reset) - time.time()) / max(int(remaining), 1)
+                    if pace > 0:
+                        await asyncio.sleep(min(pace, 60))
+
+            return response.status, headers, body
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 25  # 1リクエストあたりのPR数
+
+
+def build_graphql_query(prs: List[Tuple[str, str, int]]) -> str:
+    """複数PRを1リクエストで取得するGraphQLクエリを組み立てる"""
+    parts = []
+    for i, (owner, repo, pr_number) in enumerate(prs):
+        parts.append(
+            f'pr{i}: repository(owner: "{owner}", name: "{repo}") {{'
+            f" pullRequest(number: {pr_number}) {{"
+            " title createdAt closedAt merged"
+            " comments { totalCount }"
+            " reviews(first: 50) { nodes { author { login } submittedAt comments { totalCount } } }"
+            " reviewRequests(first: 20) { nodes { requestedReviewer { ... on User { login } } } }"
+            " } }"
+        )
+    return "query { " + " ".join(parts) + " }"
+
+
+def store_graphql_result(
+    owner: str, repo: str, pr_number: int, pr_data: Dict[str, Any], pulls_api_cache: dict
+) -> None:
+    """GraphQLのレスポンスを既存のRESTキャッシュ形式に変換して格納する
+
+    get_pull_request / get_first_person_review / get_completed /
+    get_requested_reviewers はそのままキャッシュを参照できる
+    """
+    base_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+
+    reviews = []
+    review_comments = 0
+    for node in pr_data["reviews"]["nodes"]:
+        login = node["author"]["login"] if node["author"] else "ghost"
+        reviews.append({"user": {"login": login}, "submitted_at": node["submittedAt"]})
+        review_comments += node["comments"]["totalCount"]
+
+    requested_users = []
+    for node in pr_data["reviewRequests"]["nodes"]:
+        reviewer = node["requestedReviewer"]
+        if reviewer and "login" in reviewer:
+            requested_users.append({"login": reviewer["login"]})
+
+    # GraphQLにはETagがないのでetagはNone
+    pulls_api_cache[base_url] = {
+        "etag": None,
+        "body": {
+            "title": pr_data["title"],
+            "created_at": pr_data["createdAt"],
+            "closed_at": pr_data["closedAt"],
+            "merged": pr_data["merged"],
+            "comments": pr_data["comments"]["totalCount"],
+            "review_comments": review_comments,
+        },
+    }
+    pulls_api_cache[f"{base_url}/reviews"] = {"etag": None, "body": reviews}
+    pulls_api_cache[f"{base_url}/requested_reviewers"] = {
+        "etag": None,
+        "body": {"users": requested_users, "teams": []},
     }
-    
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print(f"Error fetching {url}: {response.status_code}")
-        return {"error": True, "status_code": response.status_code}
-    
-    return response.json()
+
+
+async def fetch_pr_batch(
+    session: "aiohttp.ClientSession",
+    semaphore: "asyncio.Semaphore",
+    prs: List[Tuple[str, str, int]],
+) -> Tuple[List[Tuple[str, str, int]], Dict[str, Any]]:
+    """1バッチ分のPRをGraphQLで取得する関数（非同期処理用）"""
+    async with semaphore:
+        query = build_graphql_query(prs)
+        status, _, data = await request_with_rate_limit(
+            session, "POST", GRAPHQL_URL, json={"query": query}
+        )
+        if status != 200:
+            print(f"Error fetching GraphQL batch: {status}")
+            return prs, {"error": True, "status_code": status}
+        return prs, data
+
+
+async def fetch_prs_graphql(
+    prs: List[Tuple[str, str, int]], token: str, pulls_api_cache: dict, max_concurrency: int = 10
+) -> None:
+    """複数PRの情報をGraphQLでまとめて取得しキャッシュに格納する
+
+    RESTでは1PRあたり3リクエスト必要だったものを、エイリアスを使った
+    バッチクエリで GRAPHQL_BATCH_SIZE PR/リクエスト にまとめる
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batches = [prs[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(prs), GRAPHQL_BATCH_SIZE)]
+    async with make_async_session(token) as session:
+        tasks = [fetch_pr_batch(session, semaphore, batch) for batch in batches]
+        for coroutine in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            try:
+                batch, data = await coroutine
+            except Exception as exc:
+                print(f"GraphQL batch generated an exception: {exc}")
+                continue
+            if data.get("error") or data.get("data") is None:
+                print(f"GraphQL batch failed: {data.get('errors', data)}")
+                continue
+            for i, (owner, repo, pr_number) in enumerate(batch):
+                repo_data = data["data"].get(f"pr{i}")
+                if not repo_data or not repo_data.get("pullRequest"):
+                    print(f"GraphQL: no data for {owner}/{repo}#{pr_number}")
+                    continue
+                store_graphql_result(owner, repo, pr_number, repo_data["pullRequest"], pulls_api_cache)
 
 
 def get_requested_reviewers(
     owner: str,
     repository: str,
     pr_number: int,
-    token: str,
     pulls_api_cache: dict,
-    refresh: bool,
 ) -> list[str]:
     # Use GET /repos/{owner}/{repo}/pulls/{pull_number}/requested_reviewers
+    # 取得は事前の一括フェッチで完了している前提（ここはキャッシュ読み出しのみ）
 
     url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}/requested_reviewers"
 
-    if url not in pulls_api_cache or refresh:
-        headers = {
-            "Accept": "application/vnd.github.text-match+json",
-            "Authorization": f"Bearer {token}",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(response)
-            sys.exit(1)
-        response_json = response.json()
-        pulls_api_cache[url] = response_json
-    else:
-        response_json = pulls_api_cache[url]
-
+    response_json = pulls_api_cache[url]["body"]
     reviewers = [reviewer["login"] for reviewer in response_json["users"]]
     return reviewers
 
 
-def refresh_reviews_api_cache(
-    owner: str,
-    repository: str,
-    pr_number: int,
-    token: str,
-    pulls_api_cache: dict,
-    refresh: bool,
-) -> None:
-    # Use GET /repos/{owner}/{repo}/pulls/{pr_number}/reviews
-
-    url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}/reviews"
-
-    if url not in pulls_api_cache or refresh:
-        headers = {
-            "Accept": "application/vnd.github.text-match+json",
-            "Authorization": f"Bearer {token}",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(response)
-            sys.exit(1)
-        response_json = response.json()
-        pulls_api_cache[url] = response_json
-
-
 def get_completed(
     owner: str,
     repository: str,
@@ -285,21 +593,11 @@ def get_completed(
 ) -> list[str]:
     url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}/reviews"
 
-    response_json = pulls_api_cache[url]
-
-    reviewers = []
-    for review in response_json:
-        reviewers.append(review["user"]["login"])
-    reviewers = list(set(reviewers))  # Remove duplicates
+    response_json = pulls_api_cache[url]["body"]
 
-    if author in reviewers:  # Remove self comment
-        reviewers.remove(author)
-
-    for reviewer in requested:
-        if reviewer in reviewers:
-            reviewers.remove(reviewer)  # Remove re-requested reviewer from reviewed reviewers
-
-    return reviewers
+    # 重複除去・セルフコメント除外・再リクエスト済みレビュワー除外をset演算で一括処理
+    reviewers = {review["user"]["login"] for review in response_json} - {author} - set(requested)
+    return list(reviewers)
 
 
 def get_first_person_review(
@@ -307,7 +605,7 @@ def get_first_person_review(
 ) -> datetime | None:
     url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}/reviews"
 
-    response_json = pulls_api_cache[url]
+    response_json = pulls_api_cache[url]["body"]
 
     for review in response_json:
         if review["user"]["login"] == author:
@@ -319,71 +617,123 @@ def get_first_person_review(
     return None
 
 
-def refresh_cache(url: str, api_cache: dict, token: str) -> None:
-    headers = {
-        "Accept": "application/vnd.github.text-match+json",
-        "Authorization": f"Bearer {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print(response)
-        sys.exit(1)
-    api_cache[url] = response.json()
-
+def pr_fully_cached(owner: str, repository: str, pr_number: int, pulls_api_cache: dict) -> bool:
+    """PR1件分の3エントリ（本体・レビュー・レビュワー）がキャッシュに揃っているか"""
+    base_url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}"
+    return (
+        base_url in pulls_api_cache
+        and f"{base_url}/reviews" in pulls_api_cache
+        and f"{base_url}/requested_reviewers" in pulls_api_cache
+    )
 
-def refresh_pulls_api_cache(
-    owner: str,
-    repository: str,
-    pr_number: int,
-    pulls_api_cache: dict,
-    token: str,
-    refresh: bool,
-) -> None:
-    url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}"
-    if url not in pulls_api_cache or refresh:
-        refresh_cache(url, pulls_api_cache, token)
 
+def get_pull_request(item: Dict[str, Any], pulls_api_cache: dict) -> PullRequest:
+    """Search APIのitemから直接PullRequestを構築する
 
-def get_pull_request(owner: str, repository: str, pr_number: int, author: str, pulls_api_cache: dict) -> PullRequest:
-    url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{pr_number}"
-    assert url in pulls_api_cache
+    title/created/closed/mergedはSearch APIのレスポンスに既に含まれて
+    いるため /pulls/{n} を読み直す必要がない。レビューコメント数だけは
+    一括フェッチ済みのキャッシュから補完する
+    """
+    owner = item["repository_url"].split("/")[-2]
+    repository = item["repository_url"].split("/")[-1]
+    url = f"https://api.github.com/repos/{owner}/{repository}/pulls/{item['number']}"
 
-    response_json = pulls_api_cache[url]
-    title = response_json["title"]
-    created = convert_to_jst(response_json["created_at"])
+    title = item["title"]
+    created = convert_to_jst(item["created_at"])
     assert created is not None
-    closed = convert_to_jst(response_json["closed_at"])
-    is_merged = response_json["merged"]
-    num_comments = response_json["comments"] + response_json["review_comments"]
+    closed = convert_to_jst(item["closed_at"])
+    is_merged = (item.get("pull_request") or {}).get("merged_at") is not None
+
+    cached = pulls_api_cache.get(url)
+    if cached:
+        body = cached["body"]
+        num_comments = body["comments"] + body["review_comments"]
+    else:
+        num_comments = item["comments"]  # issueコメントのみ（レビューコメントは不明）
+
     return PullRequest(title, created, None, closed, is_merged, num_comments)
 
 
 def update_matrix_data(
-    data: np.ndarray,
+    requested_pairs: List[Tuple[int, int]],
+    completed_pairs: List[Tuple[int, int]],
     repo_name: str,
     pr_number: int,
     author: str,
-    authors: list[str],
+    author_idx: Dict[str, int],
     requested: list[str],
     completed: list[str],
 ) -> None:
-    author_index = authors.index(author)
+    """1PR分の (author, reviewer) インデックスペアを収集する
+
+    集計はループ後に Counter でまとめて行う
+    """
+    author_index = author_idx[author]
     for reviewer in requested:
-        try:
-            reviewer_index = authors.index(reviewer)
-        except ValueError:
+        reviewer_index = author_idx.get(reviewer)
+        if reviewer_index is None:
             print(f"Review requested to other group member: {reviewer} in {repo_name} #{pr_number}")
             continue
-        data[0][author_index][reviewer_index] += 1
+        requested_pairs.append((author_index, reviewer_index))
 
     for reviewer in completed:
-        try:
-            reviewer_index = authors.index(reviewer)
-        except ValueError:
+        reviewer_index = author_idx.get(reviewer)
+        if reviewer_index is None:
             print(f"Reviewed by other group member: {reviewer} in {repo_name} #{pr_number}")
             continue
-        data[1][author_index][reviewer_index] += 1
+        completed_pairs.append((author_index, reviewer_index))
+
+
+class PrDetailWriter:
+    """PR詳細を1件ずつJSON Linesでディスクに書き出すライター
+
+    全PR分のdictをメモリに抱え込まず、ループ進行中に逐次書き出す
+    """
+
+    FLUSH_INTERVAL = 100  # この件数ごとにフラッシュ
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "wb")
+        self.count = 0
+
+    def append(self, pr_detail: Dict[str, Any]) -> None:
+        self.file.write(orjson.dumps(pr_detail))
+        self.file.write(b"\n")
+        self.count += 1
+        if self.count % self.FLUSH_INTERVAL == 0:
+            self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def write_github_data(data_json: Dict[str, Any], detail_path: str, output_path: str) -> None:
+    """github_data.json を組み立てて書き出す
+
+    pr_details はJSON Linesの中間ファイルからストリーム転記するため、
+    出力時も全件をメモリに載せない
+    """
+    with open(output_path, "wb") as out:
+        header = orjson.dumps(data_json, option=orjson.OPT_INDENT_2)
+        out.write(header[:-1].rstrip())  # 閉じ括弧の手前まで
+        out.write(b',\n  "pr_details": [\n')
+        first = True
+        with open(detail_path, "rb") as details:
+            for line in details:
+                line = line.strip()
+                if not line:
+                    continue
+                if not first:
+                    out.write(b",\n")
+                out.write(b"    " + line)
+                first = False
+        out.write(b"\n  ]\n}")
+    os.remove(detail_path)
+
+
+# 表示用にアカウント名から組織サフィックスを落とす（例: foo-safie -> foo）
+_SUFFIX_RE = re.compile(r"-(safie|sf)$")
 
 
 def get_github_data(
@@ -393,11 +743,9 @@ def get_github_data(
     completed_count,
     from_date,
     to_date,
-    pr_details,
     team_name=None,
 ):
-    authors = [author.replace("-safie", "") for author in authors]
-    authors = [author.replace("-sf", "") for author in authors]
+    authors = [_SUFFIX_RE.sub("", author) for author in authors]
     result = {
         "period": [from_date, to_date],
         "labels": authors,
@@ -408,14 +756,13 @@ def get_github_data(
             },
             {
                 "label": "Review Requested",
-                "data": requested_count.tolist(),
+                "data": requested_count,
             },
             {
                 "label": "Review Completed",
-                "data": completed_count.tolist(),
+                "data": completed_count,
             },
         ],
-        "pr_details": pr_details,
     }
     
     # チーム名が指定されている場合は、結果に含める
@@ -425,86 +772,6 @@ def get_github_data(
     return result
 
 
-def process_pr_item(item: Dict[str, Any], authors: List[str], token: str, 
-                   search_api_cache: Dict[str, str], pulls_api_cache: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[str]]:
-    """PRアイテムを処理する関数（並列処理用）"""
-    owner = item["repository_url"].split("/")[-2]
-    repo_name = item["repository_url"].split("/")[-1]
-    pr_number = item["number"]
-    author = item["user"]["login"]
-    
-    # キャッシュの更新が必要かチェック
-    refresh = check_pr_update(item, search_api_cache)
-    
-    # キャッシュの更新
-    reviews_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}/reviews"
-    pulls_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}"
-    requested_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}/requested_reviewers"
-    
-    # 必要なAPIデータを並列で取得
-    urls_to_fetch = []
-    if refresh:
-        if reviews_url not in pulls_api_cache:
-            urls_to_fetch.append(reviews_url)
-        if pulls_url not in pulls_api_cache:
-            urls_to_fetch.append(pulls_url)
-        if requested_url not in pulls_api_cache:
-            urls_to_fetch.append(requested_url)
-    
-    # 並列でAPIデータを取得
-    if urls_to_fetch:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls_to_fetch)) as executor:
-            future_to_url = {executor.submit(fetch_api_data, url, token): url for url in urls_to_fetch}
-            for future in concurrent.futures.as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    data = future.result()
-                    if "error" not in data:
-                        pulls_api_cache[url] = data
-                except Exception as exc:
-                    print(f"URL {url} generated an exception: {exc}")
-    
-    # キャッシュを更新
-    search_api_cache[item["html_url"]] = item["updated_at"]
-    
-    # レビュワー情報を取得
-    requested = get_requested_reviewers(owner, repo_name, pr_number, token, pulls_api_cache, refresh)
-    completed = get_completed(owner, repo_name, pr_number, author, requested, pulls_api_cache)
-    
-    # PR詳細情報を作成
-    pull_request = get_pull_request(owner, repo_name, pr_number, author, pulls_api_cache)
-    pull_request.first_review = get_first_person_review(owner, repo_name, pr_number, author, pulls_api_cache)
-    
-    title = item["title"]
-    html_url = item["html_url"]
-    status = item["state"]
-    created_day = item["created_at"]
-    closed_day = item["closed_at"]
-    num_comments = pull_request.num_comments
-    lifetime_day = pull_request.elapsed_business_days().days
-    lifetime_hour = pull_request.elapsed_business_days().seconds // 3600
-    first_review_hour = int(pull_request.first_review_elapsed_business_days().total_seconds() // 3600)
-    first_review_min = int((pull_request.first_review_elapsed_business_days().total_seconds() % 3600) // 60)
-    
-    pr_detail = {
-        "author": author,
-        "title": title,
-        "html_url": html_url,
-        "status": status,
-        "created_day": created_day,
-        "closed_day": closed_day,
-        "requested": requested,
-        "completed": completed,
-        "num_comments": num_comments,
-        "lifetime_day": lifetime_day,
-        "lifetime_hour": lifetime_hour,
-        "first_review_hour": first_review_hour,
-        "first_review_min": first_review_min,
-    }
-    
-    return pr_detail, requested, completed
-
-
 # Excute main
 def main():
     from_date = ""
@@ -586,7 +853,8 @@ def main():
         authors.extend(users_list)
     
     # 重複を削除
-    authors = list(set(authors))
+    # 順序を保ったまま重複を削除（出力のJSONを実行ごとに安定させる）
+    authors = list(dict.fromkeys(authors))
     
     # チーム名の表示用（複数チームの場合は "Team1, Team2" のように表示）
     team_name = ", ".join(team_names) if team_names else None
@@ -596,49 +864,68 @@ def main():
     elif users_list:
         print(f"Using specified users: {len(authors)} members")
 
-    # Load search API cache
-    search_api_cache_filename = "search_api_cache.json"
-    if os.path.exists(search_api_cache_filename):
-        with open(search_api_cache_filename, "r") as f:
-            search_api_cache = json.load(f)
-    else:
-        search_api_cache = {}
-
-    # Search pull requests
-    start_time = time.time()
-    pulls = search_pr_by_authors(authors, from_date, to_date, token)  # Rate limit: 10 times per minute
-    num_pr_tot = pulls["total_count"]
-    print(f"Log: # searched pull requests: {num_pr_tot}", file=sys.stderr)
-    print(f"Search completed in {time.time() - start_time:.2f} seconds")
-
-    # Load pulls API cache
-    pulls_api_cache_filename = "pulls_api_cache.json"
-    if os.path.exists(pulls_api_cache_filename):
-        with open(pulls_api_cache_filename, "r") as f:
-            pulls_api_cache = json.load(f)
-    else:
-        pulls_api_cache = {}
-
-    # Calculate author-reviewer matrix
-    print(f"Processing PR data for {num_pr_tot} pull requests...")
-    n = len(authors)
-    data = np.zeros((2, n, n), dtype=int)  # (requested/reviewed, author, reviewer)
-    pull_requests: dict[str, list[PullRequest]] = {author: [] for author in authors}
-    author_count = np.zeros(n, dtype=int)
-
-    items = pulls["items"]
-    num_items = len(items)
-    pr_details = []
-    
-    # PRデータの処理
-    start_time = time.time()
-    
-    # バッチサイズを設定（GitHubのAPIレート制限に配慮）
-    batch_size = 10
-    for i in tqdm(range(0, num_items, batch_size)):
-        batch_items = items[i:min(i+batch_size, num_items)]
-        
-        for item in batch_items:
+    # Open SQLite cache (search + pulls)
+    cache_conn = open_cache_db(CACHE_DB_FILENAME)
+    search_api_cache = SearchApiCache(cache_conn)
+    pulls_api_cache = PullsApiCache(cache_conn)
+    detail_writer = None
+
+    try:
+        # Search pull requests
+        start_time = time.time()
+        pulls = search_pr_by_authors(authors, from_date, to_date, token)  # Rate limit: 30 times per minute
+        num_pr_tot = pulls["total_count"]
+        print(f"Log: # searched pull requests: {num_pr_tot}", file=sys.stderr)
+        print(f"Search completed in {time.time() - start_time:.2f} seconds")
+
+        # Calculate author-reviewer matrix
+        print(f"Processing PR data for {num_pr_tot} pull requests...")
+        n = len(authors)
+        author_idx = {author: i for i, author in enumerate(authors)}
+        requested_pairs: List[Tuple[int, int]] = []
+        completed_pairs: List[Tuple[int, int]] = []
+        pull_requests: dict[str, list[PullRequest]] = {author: [] for author in authors}
+
+        items = pulls["items"]
+        detail_writer = PrDetailWriter("pr_details.part.jsonl")
+
+        # PRデータの処理
+        start_time = time.time()
+
+        # 更新が必要なPRを事前に収集
+        prs_to_fetch = []
+        pending_stamp: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+        for item in items:
+            owner = item["repository_url"].split("/")[-2]
+            repo_name = item["repository_url"].split("/")[-1]
+            pr_number = item["number"]
+
+            # Cash が古い場合は更新
+            refresh = check_pr_update(item, search_api_cache)
+
+            if refresh or not pr_fully_cached(owner, repo_name, pr_number, pulls_api_cache):
+                prs_to_fetch.append((owner, repo_name, pr_number))
+                # タイムスタンプの更新はフェッチ成功を確認してから行う
+                # （先に記録すると、途中で失敗したPRが次回fresh扱いになる）
+                pending_stamp[(owner, repo_name, pr_number)] = item
+            else:
+                search_api_cache[item["html_url"]] = item["updated_at"]  # Update timestamp
+
+        # GraphQLバッチクエリでAPIデータを一括取得（セマフォで並行数を制限）
+        if prs_to_fetch:
+            # 重複を除去したうえで、同じ(owner, repo)のPRが1バッチに固まるように並べる
+            prs_to_fetch = list(dict.fromkeys(prs_to_fetch))
+            prs_to_fetch.sort(key=lambda pr: (pr[0], pr[1]))
+            print(f"Fetching {len(prs_to_fetch)} PRs via GraphQL ({GRAPHQL_BATCH_SIZE} PRs per request)...")
+            asyncio.run(fetch_prs_graphql(prs_to_fetch, token, pulls_api_cache))
+
+        # 3エントリ揃ったPRだけタイムスタンプを更新（失敗分は次回の取得対象に残す）
+        for (owner, repo_name, pr_number), item in pending_stamp.items():
+            if pr_fully_cached(owner, repo_name, pr_number, pulls_api_cache):
+                search_api_cache[item["html_url"]] = item["updated_at"]
+
+        # キャッシュ済みデータから後処理（ネットワークアクセスなし）
+        for item in tqdm(items):
             # fetch した PR の情報を取得
             owner = item["repository_url"].split("/")[-2]
             repo_name = item["repository_url"].split("/")[-1]
@@ -650,59 +937,35 @@ def main():
             created_day = item["created_at"]
             closed_day = item["closed_at"]
 
-            # Cash が古い場合は更新
-            refresh = check_pr_update(item, search_api_cache)
-            search_api_cache[item["html_url"]] = item["updated_at"]  # Update timestamp
-            
-            # 並列でAPIデータを更新
-            reviews_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}/reviews"
-            pulls_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}"
-            requested_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pr_number}/requested_reviewers"
-            
-            urls_to_fetch = []
-            if refresh or reviews_url not in pulls_api_cache:
-                urls_to_fetch.append(reviews_url)
-            if refresh or pulls_url not in pulls_api_cache:
-                urls_to_fetch.append(pulls_url)
-            if refresh or requested_url not in pulls_api_cache:
-                urls_to_fetch.append(requested_url)
-            
-            # 並列でAPIデータを取得
-            if urls_to_fetch:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls_to_fetch)) as executor:
-                    future_to_url = {executor.submit(fetch_api_data, url, token): url for url in urls_to_fetch}
-                    for future in concurrent.futures.as_completed(future_to_url):
-                        url = future_to_url[future]
-                        try:
-                            data_result = future.result()
-                            if "error" not in data_result:
-                                pulls_api_cache[url] = data_result
-                            else:
-                                print(f"Error fetching {url}: {data_result.get('status_code')}")
-                        except Exception as exc:
-                            print(f"URL {url} generated an exception: {exc}")
+            # フェッチに失敗してキャッシュが揃っていないPRはスキップ
+            # （タイムスタンプ未更新のため次回の実行で再取得される）
+            if not pr_fully_cached(owner, repo_name, pr_number, pulls_api_cache):
+                print(f"Warning: missing cached data for {repo_name} #{pr_number}, skipping")
+                continue
 
             # PR の情報を取得
-            pull_request = get_pull_request(owner, repo_name, pr_number, author, pulls_api_cache)
-            
+            pull_request = get_pull_request(item, pulls_api_cache)
+
             # PR がクローズされているがマージされていない場合はスキップ
             if status == "closed" and not pull_request.is_merged:
                 continue
-            
+
             pull_request.first_review = get_first_person_review(owner, repo_name, pr_number, author, pulls_api_cache)
             pull_requests[author].append(pull_request)
 
             # Author-reviewer matrix
-            requested = get_requested_reviewers(owner, repo_name, pr_number, token, pulls_api_cache, refresh)
+            requested = get_requested_reviewers(owner, repo_name, pr_number, pulls_api_cache)
             completed = get_completed(owner, repo_name, pr_number, author, requested, pulls_api_cache)
-            update_matrix_data(data, repo_name, pr_number, author, authors, requested, completed)
+            update_matrix_data(
+                requested_pairs, completed_pairs, repo_name, pr_number, author, author_idx, requested, completed
+            )
 
             # PR の詳細情報を取得
-            closed_time = pull_request.closed or datetime.now().astimezone(ZoneInfo("Asia/Tokyo"))
+            closed_time = pull_request.closed or PullRequest.now()
             lifetime = pull_request.elapsed_business_time(closed_time)
             lifetime_day = lifetime.days
             lifetime_hour = lifetime.seconds // 3600
-            
+
             first_review_dt = pull_request.first_review or None
             if first_review_dt:
                 first_review_time = pull_request.elapsed_business_time(first_review_dt)
@@ -728,32 +991,53 @@ def main():
                 "first_review_hour": first_review_hour,
                 "first_review_min": first_review_min,
             }
-            pr_details.append(pr_detail)
-    
-    print(f"PR processing completed in {time.time() - start_time:.2f} seconds")
+            detail_writer.append(pr_detail)
+
+        print(f"PR processing completed in {time.time() - start_time:.2f} seconds")
     
-    # キャッシュを保存
-    json.dump(pulls_api_cache, open(pulls_api_cache_filename, "w"), indent=2)
-    json.dump(search_api_cache, open(search_api_cache_filename, "w"), indent=2)
-
-    print("Author-reviewer matrix (review-requested, review-completed): ")
-    author_count = [len(pull_requests[author]) for author in authors]
-    requested_count = np.sum(data[0], axis=0)
-    completed_count = np.sum(data[1], axis=0)
-    for i in range(n):
-        print(f"{authors[i]}: {author_count[i]}, {requested_count[i]}, {completed_count[i]}")
-
-    data_json = get_github_data(
-        authors,
-        author_count,
-        requested_count,
-        completed_count,
-        from_date,
-        to_date,
-        pr_details,
-        team_name,
-    )
-    json.dump(data_json, open("github_data.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
+        # 収集した (author, reviewer) ペアをCounterで集計
+        # チーム規模の行列にnumpyはオーバーキル（import自体が~40ms）
+        requested_matrix = Counter(requested_pairs)
+        completed_matrix = Counter(completed_pairs)
+        requested_count = [0] * n
+        completed_count = [0] * n
+        for (_, reviewer_index), count in requested_matrix.items():
+            requested_count[reviewer_index] += count
+        for (_, reviewer_index), count in completed_matrix.items():
+            completed_count[reviewer_index] += count
+
+        print("Author-reviewer matrix (review-requested, review-completed): ")
+        author_count = [len(pull_requests[author]) for author in authors]
+        for i in range(n):
+            print(f"{authors[i]}: {author_count[i]}, {requested_count[i]}, {completed_count[i]}")
+
+        detail_writer.close()
+        data_json = get_github_data(
+            authors,
+            author_count,
+            requested_count,
+            completed_count,
+            from_date,
+            to_date,
+            team_name,
+        )
+        # orjsonはUTF-8のバイト列を直接出力する（ensure_ascii変換は不要）
+        write_github_data(data_json, detail_writer.path, "github_data.json")
+    except KeyboardInterrupt:
+        # Ctrl-Cでも取得済みデータはキャッシュに残す
+        print("\nInterrupted: saving fetched cache entries before exit...")
+        sys.exit(1)
+    finally:
+        # 中断時もライターを閉じ、転記前の中間ファイルを残さない
+        # （正常終了時は write_github_data が転記後に削除している）
+        if detail_writer is not None:
+            detail_writer.close()
+            if os.path.exists(detail_writer.path):
+                os.remove(detail_writer.path)
+        # 保留分のキャッシュ書き込みをコミットして閉じる
+        pulls_api_cache.commit()
+        search_api_cache.commit()
+        cache_conn.close()
 
 
 if __name__ == "__main__":
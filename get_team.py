@@ -1,12 +1,67 @@
 import json
 import config as cfg
-from github import Github
+import requests
 # import argparse
 
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# チーム一覧とメンバーを1クエリでまとめて取得する
+# (REST だとチーム数ぶんの get_members() 呼び出しが必要になる)
+TEAMS_QUERY = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    teams(first: 50, after: $cursor) {
+      pageInfo { endCursor hasNextPage }
+      nodes {
+        name
+        slug
+        members(first: 100) {
+          pageInfo { endCursor hasNextPage }
+          nodes { login }
+        }
+      }
+    }
+  }
+}
+"""
+
+# 100人を超えるチームだけ追加でページングする
+MEMBERS_QUERY = """
+query($org: String!, $slug: String!, $cursor: String) {
+  organization(login: $org) {
+    team(slug: $slug) {
+      members(first: 100, after: $cursor) {
+        pageInfo { endCursor hasNextPage }
+        nodes { login }
+      }
+    }
+  }
+}
+"""
+
+
+def run_query(query, variables, token):
+    """GraphQLクエリを実行してdataを返す"""
+    response = requests.post(
+        GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        headers={"Authorization": f"bearer {token}"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    result = response.json()
+    if "errors" in result:
+        raise RuntimeError(f"GraphQL エラー: {result['errors']}")
+    return result["data"]
+
+
 def get_teams_and_members(org_name, output_file, token=None):
     """
     指定された組織のすべてのチームとメンバーを取得し、JSON形式でファイルに出力する
-    
+
+    GraphQLでチームとメンバーを一括取得するため、RESTのようにチームごとの
+    メンバー取得リクエストは発生しない（50チーム単位のページングのみ）
+
     Args:
         org_name (str): GitHub 組織名
         output_file (str): 出力ファイルのパス
@@ -15,41 +70,50 @@ def get_teams_and_members(org_name, output_file, token=None):
     # トークンの取得 (引数 > 環境変数)
     if not token:
         token = cfg.github_token
-    
+
     if not token:
         raise ValueError("GitHub トークンが必要です。引数で指定するか、GITHUB_TOKEN 環境変数を設定してください。")
-    
-    # GitHub クライアントの初期化
-    g = Github(token)
-    
+
     try:
-        # 組織の取得
-        org = g.get_organization(org_name)
-        
         # チームとメンバーの情報を格納する辞書
         teams_data = {}
-        
-        # すべてのチームを取得
-        teams = org.get_teams()
+
         print(f"組織 '{org_name}' のチーム情報を取得中...")
-        
-        for team in teams:
-            team_name = team.name
-            print(f"チーム '{team_name}' のメンバーを取得中...")
-            
-            # チームメンバーの取得
-            members = team.get_members()
-            member_list = [member.login for member in members]
-            
-            # 結果を辞書に追加
-            teams_data[team_name] = member_list
-        
+        cursor = None
+        while True:
+            data = run_query(TEAMS_QUERY, {"org": org_name, "cursor": cursor}, token)
+            teams = data["organization"]["teams"]
+
+            for team in teams["nodes"]:
+                team_name = team["name"]
+                member_list = [member["login"] for member in team["members"]["nodes"]]
+
+                # 100人を超えるチームは残りのページを追加取得
+                member_page = team["members"]["pageInfo"]
+                while member_page["hasNextPage"]:
+                    print(f"チーム '{team_name}' の追加メンバーを取得中...")
+                    member_data = run_query(
+                        MEMBERS_QUERY,
+                        {"org": org_name, "slug": team["slug"], "cursor": member_page["endCursor"]},
+                        token,
+                    )
+                    members = member_data["organization"]["team"]["members"]
+                    member_list += [member["login"] for member in members["nodes"]]
+                    member_page = members["pageInfo"]
+
+                # 結果を辞書に追加
+                teams_data[team_name] = member_list
+
+            if not teams["pageInfo"]["hasNextPage"]:
+                break
+            cursor = teams["pageInfo"]["endCursor"]
+
         # JSON ファイルとして出力
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(teams_data, f, ensure_ascii=False, indent=4)
-        
+
         print(f"完了しました。結果は {output_file} に保存されました。")
-        
+
     except Exception as e:
         print(f"エラーが発生しました: {str(e)}")
 
@@ -58,7 +122,7 @@ if __name__ == "__main__":
     # parser.add_argument('org_name', help='GitHub 組織名')
     # parser.add_argument('--output', '-o', default='teams_members.json', help='出力ファイル名 (デフォルト: teams_members.json)')
     # parser.add_argument('--token', '-t', help='GitHub アクセストークン (環境変数 GITHUB_TOKEN からも取得可能)')
-    
+
     # args = parser.parse_args()
-    
-    get_teams_and_members("SafieDev", "teams.json")
\ No newline at end of file
+
+    get_teams_and_members("SafieDev", "teams.json")